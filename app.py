@@ -3,19 +3,25 @@ AUTOLEADAI - Demo Web Interface
 Flask web application for demonstrating Module 1
 Author: Team AUTOLEADAI
 """
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, render_template, request, jsonify, send_from_directory, Response
 from flask_cors import CORS
+import audioop
+import hashlib
+import itertools
+import json
 import os
 import logging
+import threading
+import time
+import wave
+from collections import OrderedDict
 from pathlib import Path
 from src.call_handler import CallHandler
 import config
 
-# Setup logging
-logging.basicConfig(
-    level=getattr(logging, config.LOG_LEVEL),
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Setup logging (single root-logger configuration for the whole process)
+from src._logging import setup as setup_logging
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
@@ -38,6 +44,147 @@ def index():
     return render_template('index.html')
 
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Userspace unique-id source for upload filenames: PID + monotonic clock +
+# counter is collision-free without a getrandom() syscall per request
+_upload_counter = itertools.count()
+
+
+def _unique_upload_name(stem):
+    """Build a unique .wav filename for an upload without touching the kernel RNG"""
+    return f"upload_{stem}_{os.getpid()}_{time.monotonic_ns()}_{next(_upload_counter)}.wav"
+
+
+# Result cache keyed by upload content hash: identical files (demo
+# fixtures, retried uploads) skip Whisper and spam detection entirely.
+# Uses Redis when REDIS_URL is configured (shared across gunicorn
+# workers), otherwise a small in-process LRU.
+CALL_CACHE_SIZE = 256
+CALL_CACHE_TTL = 3600
+
+_call_cache = OrderedDict()
+_call_cache_lock = threading.Lock()
+
+_redis_client = None
+if os.getenv('REDIS_URL'):
+    try:
+        import redis
+        _redis_client = redis.Redis.from_url(os.environ['REDIS_URL'], decode_responses=True)
+    except ImportError:
+        logger.warning("REDIS_URL set but redis-py not installed, using in-process cache")
+
+
+def _hash_upload(stream):
+    """Content hash of an upload stream; the stream is rewound afterwards"""
+    digest = hashlib.blake2b(digest_size=16)
+    while True:
+        chunk = stream.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def _call_cache_get(key):
+    if _redis_client is not None:
+        try:
+            cached = _redis_client.get(f'call:{key}')
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"Redis cache read failed: {e}")
+            return None
+    with _call_cache_lock:
+        if key in _call_cache:
+            _call_cache.move_to_end(key)
+            return _call_cache[key]
+    return None
+
+
+def _call_cache_put(key, result):
+    if _redis_client is not None:
+        try:
+            _redis_client.setex(f'call:{key}', CALL_CACHE_TTL, json.dumps(result))
+            return
+        except Exception as e:
+            logger.warning(f"Redis cache write failed: {e}")
+            return
+    with _call_cache_lock:
+        _call_cache[key] = result
+        _call_cache.move_to_end(key)
+        while len(_call_cache) > CALL_CACHE_SIZE:
+            _call_cache.popitem(last=False)
+
+
+def _save_upload(file, filepath):
+    """Stream an uploaded file to disk, normalizing WAV input inline
+
+    WAV uploads are converted to 16 kHz mono 16-bit PCM with audioop
+    (lin2lin/tomono/ratecv) chunk by chunk as they are written, so the
+    downstream pipeline receives target-format audio without an ffmpeg
+    subprocess or a second full-file pass. Other formats (e.g. mp3) are
+    streamed to disk unchanged and converted later by librosa.
+    """
+    header = file.stream.read(12)
+    file.stream.seek(0)
+    is_wav = len(header) == 12 and header[:4] == b'RIFF' and header[8:12] == b'WAVE'
+
+    if is_wav:
+        try:
+            _save_wav_as_pcm16k(file.stream, filepath)
+            return
+        except wave.Error as e:
+            logger.warning(f"Inline WAV conversion failed ({e}), saving raw upload")
+            file.stream.seek(0)
+
+    with open(filepath, 'wb') as f:
+        while True:
+            chunk = file.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            f.write(chunk)
+
+
+def _save_wav_as_pcm16k(stream, filepath):
+    """Convert a WAV stream to 16 kHz mono 16-bit PCM while writing it out"""
+    with wave.open(stream, 'rb') as src:
+        in_rate = src.getframerate()
+        in_channels = src.getnchannels()
+        in_width = src.getsampwidth()
+
+        # audioop.tomono only downmixes stereo; punt anything with more
+        # channels to the raw-save path so librosa handles it later instead
+        # of writing interleaved multi-channel frames under a mono header
+        if in_channels > 2:
+            raise wave.Error(f"unsupported channel count: {in_channels}")
+
+        with wave.open(filepath, 'wb') as dst:
+            dst.setnchannels(config.CHANNELS)
+            dst.setsampwidth(2)
+            dst.setframerate(config.SAMPLE_RATE)
+
+            ratecv_state = None
+            while True:
+                frames = src.readframes(8192)
+                if not frames:
+                    break
+                if in_width != 2:
+                    if in_width == 1:
+                        # 8-bit WAV is unsigned; recenter around zero before
+                        # lin2lin, which assumes signed samples
+                        frames = audioop.bias(frames, 1, -128)
+                    frames = audioop.lin2lin(frames, in_width, 2)
+                if in_channels == 2:
+                    frames = audioop.tomono(frames, 2, 0.5, 0.5)
+                if in_rate != config.SAMPLE_RATE:
+                    frames, ratecv_state = audioop.ratecv(
+                        frames, 2, config.CHANNELS, in_rate,
+                        config.SAMPLE_RATE, ratecv_state
+                    )
+                dst.writeframes(frames)
+
+
 @app.route('/api/process-call', methods=['POST'])
 def process_call():
     """
@@ -50,27 +197,96 @@ def process_call():
                 'success': False,
                 'error': 'No audio file provided'
             }), 400
-        
+
         file = request.files['audio']
-        
+
         if file.filename == '':
             return jsonify({
                 'success': False,
                 'error': 'No file selected'
             }), 400
-        
+
+        # Identical uploads are answered from the cache
+        cache_key = _hash_upload(file.stream)
+        cached = _call_cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached result for upload {cache_key}")
+            return jsonify(cached)
+
         # Save uploaded file
-        filename = f"upload_{Path(file.filename).stem}_{os.urandom(4).hex()}.wav"
+        filename = _unique_upload_name(Path(file.filename).stem)
         filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
+        _save_upload(file, filepath)
+
         logger.info(f"Processing uploaded file: {filepath}")
-        
-        # Process the call
+
+        # Single-pass pipeline: this endpoint only returns the final result,
+        # so the streaming variant (which re-runs Whisper on a growing
+        # buffer to produce partials nobody would see) stays reserved for
+        # the SSE endpoint below
         result = call_handler.process_call(filepath, source_type='file')
-        
+
+        if result.get('success'):
+            _call_cache_put(cache_key, result)
+
         return jsonify(result)
-        
+
+    except Exception as e:
+        logger.error(f"Error processing call: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/process-call-stream', methods=['POST'])
+def process_call_stream():
+    """
+    Process an uploaded call with streaming partial transcripts (SSE)
+
+    Emits 'partial' events with the confirmed transcript prefix and an
+    early spam verdict while transcription is still running, then a final
+    'result' event matching the /api/process-call response.
+    """
+    try:
+        if 'audio' not in request.files:
+            return jsonify({
+                'success': False,
+                'error': 'No audio file provided'
+            }), 400
+
+        file = request.files['audio']
+
+        if file.filename == '':
+            return jsonify({
+                'success': False,
+                'error': 'No file selected'
+            }), 400
+
+        cache_key = _hash_upload(file.stream)
+        cached = _call_cache_get(cache_key)
+        if cached is not None:
+            logger.info(f"Returning cached result for upload {cache_key}")
+
+            def generate_cached():
+                yield f"data: {json.dumps(dict(cached, type='result'))}\n\n"
+
+            return Response(generate_cached(), mimetype='text/event-stream')
+
+        filename = _unique_upload_name(Path(file.filename).stem)
+        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        _save_upload(file, filepath)
+
+        logger.info(f"Processing uploaded file (streaming): {filepath}")
+
+        def generate():
+            for event in call_handler.process_call_stream(filepath):
+                if event.get('type') == 'result' and event.get('success'):
+                    _call_cache_put(cache_key, {k: v for k, v in event.items() if k != 'type'})
+                yield f"data: {json.dumps(event)}\n\n"
+
+        return Response(generate(), mimetype='text/event-stream')
+
     except Exception as e:
         logger.error(f"Error processing call: {e}")
         return jsonify({
@@ -126,10 +342,12 @@ def get_recent_calls():
     try:
         limit = request.args.get('limit', 10, type=int)
         calls = call_handler.get_recent_calls(limit=limit)
-        
+
         return jsonify({
             'success': True,
-            'calls': calls
+            # LazyCall rows expand to plain dicts only here, at the
+            # serialization boundary
+            'calls': [dict(call) for call in calls]
         })
     except Exception as e:
         logger.error(f"Error getting recent calls: {e}")
@@ -150,7 +368,17 @@ def health_check():
 
 
 if __name__ == '__main__':
+    # Development server only. In production run behind gunicorn so the
+    # model loads once and workers handle requests concurrently:
+    #   gunicorn -c gunicorn.conf.py wsgi
     logger.info("Starting AUTOLEADAI Module 1 Demo Server...")
     logger.info("Access the dashboard at: http://localhost:5000")
-    app.run(debug=True, host='0.0.0.0', port=5000)
+
+    # Warm the models in the background here, not at import time: under
+    # gunicorn's preload_app the master would fork mid-load and workers
+    # would inherit a held singleton lock (gunicorn warms via post_fork)
+    from src.warmup import prewarm
+    prewarm()
+
+    app.run(debug=os.getenv('FLASK_DEBUG', '1') == '1', host='0.0.0.0', port=5000)
 
@@ -37,6 +37,16 @@ SPAM_STORAGE_PATH = os.getenv('SPAM_STORAGE_PATH', 'data/spam/')
 # Whisper Model Settings
 WHISPER_MODEL = 'base'  # Options: tiny, base, small, medium, large
 WHISPER_LANGUAGE = 'en'
+# 'faster-whisper' (CTranslate2, ~4x faster) or 'openai-whisper' (reference)
+WHISPER_BACKEND = os.getenv('WHISPER_BACKEND', 'faster-whisper')
+# 'auto' picks int8 on CPU (quarter the weight bandwidth) and float16 on
+# GPU; set explicitly to override
+WHISPER_COMPUTE_TYPE = os.getenv('WHISPER_COMPUTE_TYPE', 'auto')
+
+# Noise Reduction
+# Numba-compiled spectral gate (src/_spectral_gate.py); set to 'false' to
+# force the noisereduce library path
+USE_NUMBA_SPECTRAL_GATE = os.getenv('USE_NUMBA_SPECTRAL_GATE', 'true').lower() == 'true'
 
 # Create necessary directories
 for path in [LOG_PATH, AUDIO_STORAGE_PATH, TRANSCRIPTS_PATH, SPAM_STORAGE_PATH, 'models', 'data']:
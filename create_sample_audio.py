@@ -7,6 +7,7 @@ Note: This script requires gTTS (Google Text-to-Speech)
 Install with: pip install gTTS
 """
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 try:
@@ -63,6 +64,14 @@ SAMPLE_CALLS = {
 }
 
 
+def _synthesize_sample(filename, data, samples_dir):
+    """Generate one sample audio file (network call to Google TTS)"""
+    tts = gTTS(text=data['text'], lang='en', slow=False)
+    output_path = samples_dir / filename
+    tts.save(str(output_path))
+    return output_path
+
+
 def create_sample_audio_files():
     """Create sample audio files using Google Text-to-Speech"""
     
@@ -85,31 +94,34 @@ def create_sample_audio_files():
     
     legitimate_count = 0
     spam_count = 0
-    
-    for filename, data in SAMPLE_CALLS.items():
-        try:
+
+    # Each synthesis is a blocking HTTPS round-trip to Google TTS, so
+    # running them concurrently cuts wall time to roughly one round-trip
+    with ThreadPoolExecutor(max_workers=len(SAMPLE_CALLS)) as executor:
+        futures = {
+            executor.submit(_synthesize_sample, filename, data, samples_dir): (filename, data)
+            for filename, data in SAMPLE_CALLS.items()
+        }
+
+        for future in as_completed(futures):
+            filename, data = futures[future]
             print(f"Creating: {filename}")
             print(f"  Type: {data['type']}")
             print(f"  Description: {data['description']}")
-            
-            # Generate speech
-            tts = gTTS(text=data['text'], lang='en', slow=False)
-            
-            # Save file
-            output_path = samples_dir / filename
-            tts.save(str(output_path))
-            
-            print(f"  [OK] Saved to: {output_path}")
-            print()
-            
-            if data['type'] == 'legitimate':
-                legitimate_count += 1
-            else:
-                spam_count += 1
-                
-        except Exception as e:
-            print(f"  [ERROR] Error creating {filename}: {e}")
-            print()
+
+            try:
+                output_path = future.result()
+                print(f"  [OK] Saved to: {output_path}")
+                print()
+
+                if data['type'] == 'legitimate':
+                    legitimate_count += 1
+                else:
+                    spam_count += 1
+
+            except Exception as e:
+                print(f"  [ERROR] Error creating {filename}: {e}")
+                print()
     
     # Create README in samples directory
     readme_content = f"""# AUTOLEADAI Sample Audio Files
@@ -9,62 +9,72 @@ from pathlib import Path
 from colorama import Fore, Style, init
 from src.call_handler import CallHandler
 
-# Initialize colorama
-init()
-
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Only emit ANSI colors on a real terminal; redirected output (files, CI
+# logs) gets plain text and colorama stays uninitialized
+USE_COLOR = sys.stdout.isatty()
+if USE_COLOR:
+    init()
+
+
+def _c(text, color):
+    """Colorize text when stdout is a terminal, pass through otherwise"""
+    if USE_COLOR:
+        return color + text + Style.RESET_ALL
+    return text
+
+# Setup logging (single root-logger configuration for the whole process)
+from src._logging import setup as setup_logging
+setup_logging(level='INFO', fmt='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
 def print_banner():
     """Print demo banner"""
-    print(Fore.CYAN + "=" * 60)
-    print("  🤖 AUTOLEADAI - Module 1 Demo")
-    print("  Call Handling & Speech Processing with Spam Filtering")
-    print("  FAST-NUCES Islamabad | FYP 2025-2026")
-    print("=" * 60 + Style.RESET_ALL)
-    print()
+    banner = _c(
+        "=" * 60 + "\n"
+        "  🤖 AUTOLEADAI - Module 1 Demo\n"
+        "  Call Handling & Speech Processing with Spam Filtering\n"
+        "  FAST-NUCES Islamabad | FYP 2025-2026\n"
+        + "=" * 60,
+        Fore.CYAN
+    )
+    sys.stdout.write(banner + "\n\n")
 
 
 def print_result(result):
-    """Print formatted result"""
+    """Print formatted result with a single buffered write"""
     if not result.get('success'):
-        print(Fore.RED + f"❌ Error: {result.get('error')}" + Style.RESET_ALL)
+        sys.stdout.write(_c(f"❌ Error: {result.get('error')}", Fore.RED) + "\n")
         return
-    
-    print()
-    print(Fore.CYAN + "=" * 60)
-    print("📊 CALL PROCESSING RESULT")
-    print("=" * 60 + Style.RESET_ALL)
-    
+
+    lines = [
+        "",
+        _c("=" * 60 + "\n📊 CALL PROCESSING RESULT\n" + "=" * 60, Fore.CYAN),
+    ]
+
     # Spam status
     if result['is_spam']:
-        print(Fore.RED + "🚫 STATUS: SPAM CALL DETECTED" + Style.RESET_ALL)
+        lines.append(_c("🚫 STATUS: SPAM CALL DETECTED", Fore.RED))
     else:
-        print(Fore.GREEN + "✅ STATUS: LEGITIMATE CALL" + Style.RESET_ALL)
-    
-    print(f"\n📋 Call ID: {result['call_id']}")
-    print(f"⏱️  Processing Time: {result['processing_time']:.2f} seconds")
-    print(f"📊 Spam Confidence: {result['spam_confidence']:.2%}")
-    
+        lines.append(_c("✅ STATUS: LEGITIMATE CALL", Fore.GREEN))
+
+    lines.append(f"\n📋 Call ID: {result['call_id']}")
+    lines.append(f"⏱️  Processing Time: {result['processing_time']:.2f} seconds")
+    lines.append(f"📊 Spam Confidence: {result['spam_confidence']:.2%}")
+
     # Transcript
-    print(f"\n📝 Transcript:")
-    print(Fore.YELLOW + "-" * 60)
-    print(result['transcript'])
-    print("-" * 60 + Style.RESET_ALL)
-    
+    lines.append("\n📝 Transcript:")
+    lines.append(_c("-" * 60 + "\n" + result['transcript'] + "\n" + "-" * 60, Fore.YELLOW))
+
     # Spam features
     if result['is_spam'] and result.get('spam_features'):
-        print(f"\n⚠️  Detected Spam Indicators:")
+        lines.append("\n⚠️  Detected Spam Indicators:")
         for category, info in result['spam_features'].items():
             if info['detected'] and info['keywords']:
-                print(f"  • {category}: {', '.join(info['keywords'])}")
-    
-    print()
+                lines.append(f"  • {category}: {', '.join(info['keywords'])}")
+
+    lines.append("")
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 def main():
@@ -72,24 +82,24 @@ def main():
     print_banner()
     
     # Initialize call handler
-    print(Fore.YELLOW + "Initializing AUTOLEADAI Module 1..." + Style.RESET_ALL)
+    print(_c("Initializing AUTOLEADAI Module 1...", Fore.YELLOW))
     call_handler = CallHandler()
-    print(Fore.GREEN + "✓ System initialized\n" + Style.RESET_ALL)
+    print(_c("✓ System initialized", Fore.GREEN) + "\n")
     
     # Get audio file path
     if len(sys.argv) > 1:
         audio_path = sys.argv[1]
     else:
-        print(Fore.CYAN + "Enter path to audio file (or press Enter for demo recording): " + Style.RESET_ALL, end='')
+        print(_c("Enter path to audio file (or press Enter for demo recording): ", Fore.CYAN), end='')
         audio_path = input().strip()
     
     # Process call
     if audio_path and Path(audio_path).exists():
-        print(f"\n{Fore.YELLOW}Processing audio file: {audio_path}{Style.RESET_ALL}")
+        print("\n" + _c(f"Processing audio file: {audio_path}", Fore.YELLOW))
         result = call_handler.process_call(audio_path, source_type='file')
     else:
-        print(f"\n{Fore.YELLOW}Recording audio for 10 seconds...{Style.RESET_ALL}")
-        print(Fore.RED + "Speak now!" + Style.RESET_ALL)
+        print("\n" + _c("Recording audio for 10 seconds...", Fore.YELLOW))
+        print(_c("Speak now!", Fore.RED))
         result = call_handler.process_call("10", source_type='record')
     
     # Display result
@@ -97,24 +107,22 @@ def main():
     
     # Show statistics
     stats = call_handler.get_call_statistics()
-    print(Fore.CYAN + "=" * 60)
-    print("📈 SYSTEM STATISTICS")
-    print("=" * 60 + Style.RESET_ALL)
+    sys.stdout.write(_c("=" * 60 + "\n📈 SYSTEM STATISTICS\n" + "=" * 60, Fore.CYAN) + "\n")
     print(f"Total Calls: {stats['total_calls']}")
     print(f"Spam Calls: {stats['spam_calls']}")
     print(f"Legitimate Calls: {stats['legitimate_calls']}")
     print(f"Spam Rate: {stats['spam_rate']:.1f}%")
     print()
     
-    print(Fore.GREEN + "Demo completed successfully! ✓" + Style.RESET_ALL)
+    print(_c("Demo completed successfully! ✓", Fore.GREEN))
 
 
 if __name__ == '__main__':
     try:
         main()
     except KeyboardInterrupt:
-        print(f"\n{Fore.YELLOW}Demo interrupted by user{Style.RESET_ALL}")
+        print("\n" + _c("Demo interrupted by user", Fore.YELLOW))
     except Exception as e:
-        print(f"\n{Fore.RED}Error: {e}{Style.RESET_ALL}")
+        print("\n" + _c(f"Error: {e}", Fore.RED))
         logger.exception("Demo failed")
 
@@ -0,0 +1,38 @@
+"""
+AUTOLEADAI - Gunicorn Configuration
+Production server settings for the demo web interface
+
+Usage: gunicorn -c gunicorn.conf.py wsgi
+"""
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:5000')
+
+# Load the app once in the master before forking: workers then share the
+# model's memory-mapped arrays copy-on-write instead of each deserializing
+# its own copy.
+preload_app = True
+
+workers = int(os.getenv('WEB_WORKERS', os.cpu_count() or 1))
+worker_class = 'gthread'
+threads = int(os.getenv('WEB_THREADS', 4))
+
+# Keep worker heartbeat files in RAM instead of on disk
+worker_tmp_dir = '/dev/shm'
+
+# Whisper transcription of a long upload can exceed the default 30s
+timeout = int(os.getenv('WEB_TIMEOUT', 300))
+
+
+def post_fork(server, worker):
+    """Warm each worker's models right after fork
+
+    Warm-up must not run in the preloading master: forking while the
+    loader thread holds a singleton lock would hand every worker a lock
+    that is never released (the thread doesn't survive the fork), and
+    the workers would share the master's sqlite cache connection. After
+    fork each worker loads its own models in the background while
+    gunicorn finishes booting it.
+    """
+    from src.warmup import prewarm
+    prewarm()
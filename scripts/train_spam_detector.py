@@ -17,57 +17,85 @@ from typing import List, Tuple
 import joblib
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import scipy.sparse
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
 
 
 LOGGER = logging.getLogger("train_spam_detector")
 logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
 
+N_JOBS = int(os.getenv("TRAIN_N_JOBS", os.cpu_count() or 1))
+
 REPO_ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = REPO_ROOT / "Spam Filtering"
 MODELS_DIR = REPO_ROOT / "models"
 
 
-def _read_smsspamcollection(path: Path) -> pd.DataFrame:
-    # Typical format: label TAB message
-    df = pd.read_csv(path, sep="\t", header=None, names=["label", "text"], encoding="utf-8", quoting=3)
-    return df
+# Label spellings that mean "spam" across the supported datasets
+_SPAM_LABELS = pa.array(["spam", "fraud", "1", "true", "yes"])
+
+
+def _normalize_labels(labels: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Map raw label values to int8 {ham: 0, spam: 1} in Arrow kernels."""
+    as_str = pc.utf8_lower(pc.utf8_trim_whitespace(labels.cast(pa.string())))
+    return pc.is_in(as_str, value_set=_SPAM_LABELS).cast(pa.int8())
+
+
+def _read_tab_separated(path: Path) -> pa.Table:
+    # Typical format: label TAB message (SMSSpamCollection, fraud_call.file)
+    table = pv.read_csv(
+        path,
+        read_options=pv.ReadOptions(column_names=["label", "text"]),
+        parse_options=pv.ParseOptions(delimiter="\t", quote_char=False),
+    )
+    return pa.table({
+        "text": table["text"].cast(pa.string()),
+        "label": _normalize_labels(table["label"]),
+    })
+
+
+def _read_smsspamcollection(path: Path) -> pa.Table:
+    return _read_tab_separated(path)
 
 
-def _read_emails_csv(path: Path) -> pd.DataFrame:
+def _read_emails_csv(path: Path) -> pa.Table:
     # Try common schemas
-    df = pd.read_csv(path)
-    cols = {c.lower(): c for c in df.columns}
+    table = pv.read_csv(path)
+    cols = {c.lower(): c for c in table.column_names}
     # Heuristics for columns
     text_col = cols.get("text") or cols.get("message") or cols.get("content") or cols.get("body")
     label_col = cols.get("label") or cols.get("target") or cols.get("is_spam") or cols.get("spam")
     if not text_col or not label_col:
-        # Fallback: try last column as label if binary, first string column as text
-        text_col = text_col or df.select_dtypes(include=["object"]).columns[0]
-        label_col = label_col or df.columns[-1]
-    out = pd.DataFrame({"text": df[text_col].astype(str), "label": df[label_col]})
-    # Normalize labels to {ham:0, spam:1}
-    out["label"] = out["label"].apply(lambda v: 1 if str(v).strip().lower() in {"spam", "1", "true", "yes"} else 0)
-    return out
+        # Fallback: first string column as text, last column as label
+        string_cols = [f.name for f in table.schema if pa.types.is_string(f.type)]
+        text_col = text_col or string_cols[0]
+        label_col = label_col or table.column_names[-1]
+    return pa.table({
+        "text": table[text_col].cast(pa.string()),
+        "label": _normalize_labels(table[label_col]),
+    })
 
 
-def _read_enron_csv(path: Path) -> pd.DataFrame:
+def _read_enron_csv(path: Path) -> pa.Table:
     # Reuse the generic CSV reader
     return _read_emails_csv(path)
 
 
-def _load_datasets(base: Path) -> pd.DataFrame:
-    frames: List[pd.DataFrame] = []
+def _load_datasets(base: Path) -> pa.Table:
+    frames: List[pa.Table] = []
 
     smsspam = base / "SMSSpamCollection"
     if smsspam.exists():
         LOGGER.info("Loading SMSSpamCollection ...")
-        df = _read_smsspamcollection(smsspam)
-        df["label"] = df["label"].map({"ham": 0, "spam": 1}).astype(int)
-        frames.append(df)
+        frames.append(_read_smsspamcollection(smsspam))
 
     emails_csv = base / "emails.csv"
     if emails_csv.exists():
@@ -83,8 +111,7 @@ def _load_datasets(base: Path) -> pd.DataFrame:
     if better_csv.exists():
         LOGGER.info("Loading better30_cleaned.csv ...")
         try:
-            df = _read_emails_csv(better_csv)
-            frames.append(df)
+            frames.append(_read_emails_csv(better_csv))
         except Exception as e:
             LOGGER.warning("Skipping better30_cleaned.csv: %s", e)
 
@@ -93,14 +120,7 @@ def _load_datasets(base: Path) -> pd.DataFrame:
     if fraud_file.exists():
         LOGGER.info("Loading fraud_call.file ...")
         try:
-            df = pd.read_csv(fraud_file, sep="\t", header=None, names=["label", "text"], encoding="utf-8", quoting=3)
-            df["label"] = df["label"].astype(str).str.strip().str.lower().map({
-                "spam": 1,
-                "fraud": 1,
-                "ham": 0,
-                "normal": 0,
-            }).fillna(0).astype(int)
-            frames.append(df)
+            frames.append(_read_tab_separated(fraud_file))
         except Exception as e:
             LOGGER.warning("Skipping fraud_call.file: %s", e)
 
@@ -110,12 +130,16 @@ def _load_datasets(base: Path) -> pd.DataFrame:
             "SMSSpamCollection, emails.csv, enron_spam_data.csv, better30_cleaned.csv"
         )
 
-    data = pd.concat(frames, ignore_index=True)
-    # Drop empties and duplicates
-    data["text"] = data["text"].astype(str).str.strip()
-    data = data.dropna(subset=["text"]).drop_duplicates(subset=["text"])\
-               .reset_index(drop=True)
-    return data[["text", "label"]]
+    table = pa.concat_tables(frames)
+    # Trim, drop empties and duplicates — all in Arrow's native kernels, so
+    # no Python str objects are materialized until the train/test split.
+    text = pc.utf8_trim_whitespace(table["text"])
+    table = pa.table({"text": text, "label": table["label"]})
+    table = table.filter(
+        pc.and_(pc.is_valid(text), pc.not_equal(text, ""))
+    )
+    table = table.group_by("text").aggregate([("label", "max")])
+    return table.rename_columns(["text", "label"])
 
 
 def _augment_free_offer_samples(base: Path) -> pd.DataFrame:
@@ -151,20 +175,44 @@ def _augment_free_offer_samples(base: Path) -> pd.DataFrame:
 
     return pd.DataFrame({
         "text": phrases,
-        "label": [1] * len(phrases),
+        "label": np.ones(len(phrases), dtype=np.int8),
     })
 
 
-def _build_vectorizer() -> TfidfVectorizer:
-    # Word + char n-grams for robustness to obfuscation
-    return TfidfVectorizer(
-        strip_accents="unicode",
-        lowercase=True,
-        stop_words="english",
-        ngram_range=(1, 2),
-        analyzer="word",
-        max_features=5000,
+def _build_vectorizer() -> Pipeline:
+    # Stateless hashing front-end instead of a fitted vocabulary: transform
+    # is a pure hash-and-increment loop with no per-token dict probe, and no
+    # vocabulary has to be shipped with the artifacts. Only the IDF vector
+    # (TfidfTransformer) is learned from data.
+    return Pipeline([
+        ("hash", HashingVectorizer(
+            strip_accents="unicode",
+            lowercase=True,
+            stop_words="english",
+            ngram_range=(1, 2),
+            analyzer="word",
+            n_features=2 ** 18,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32,
+        )),
+        ("tfidf", TfidfTransformer(sublinear_tf=True)),
+    ])
+
+
+def _hash_transform_parallel(hasher: HashingVectorizer, texts, n_jobs: int):
+    """Shard the corpus and run the stateless hashing transform in parallel.
+
+    Tokenization/hashing releases the GIL, so threads scale near-linearly
+    without the pickling cost of process workers.
+    """
+    if n_jobs <= 1 or len(texts) < 2 * n_jobs:
+        return hasher.transform(texts)
+    chunks = np.array_split(np.asarray(texts, dtype=object), n_jobs)
+    parts = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(hasher.transform)(chunk) for chunk in chunks
     )
+    return scipy.sparse.vstack(parts)
 
 
 def train_and_save(data: pd.DataFrame, out_dir: Path) -> Tuple[Path, Path]:
@@ -173,28 +221,47 @@ def train_and_save(data: pd.DataFrame, out_dir: Path) -> Tuple[Path, Path]:
     )
 
     vectorizer = _build_vectorizer()
-    X_train_vec = vectorizer.fit_transform(X_train)
+    hasher = vectorizer.named_steps["hash"]
+    X_train_hashed = _hash_transform_parallel(hasher, X_train, N_JOBS)
+    X_train_vec = vectorizer.named_steps["tfidf"].fit_transform(X_train_hashed)
     X_val_vec = vectorizer.transform(X_val)
 
     model = LogisticRegression(max_iter=2000, n_jobs=None, class_weight="balanced")
     model.fit(X_train_vec, y_train)
 
+    # Downcast to float32: the inference-time sparse dot is memory-bound, so
+    # halving the coefficient/IDF bytes roughly doubles predict throughput
+    # with no accuracy change at the precision we report.
+    model.coef_ = model.coef_.astype(np.float32)
+    model.intercept_ = model.intercept_.astype(np.float32)
+    tfidf = vectorizer.named_steps["tfidf"]
+    tfidf._idf_diag = tfidf._idf_diag.astype(np.float32)
+
     y_pred = model.predict(X_val_vec)
     LOGGER.info("Validation report:\n%s", classification_report(y_val, y_pred, digits=3))
 
     out_dir.mkdir(parents=True, exist_ok=True)
     model_path = out_dir / "spam_detector.pkl"
     vec_path = out_dir / "vectorizer.pkl"
-    joblib.dump(model, model_path)
-    joblib.dump(vectorizer, vec_path)
+    joblib.dump(model, model_path, compress=3)
+    joblib.dump(vectorizer, vec_path, compress=3)
     LOGGER.info("Saved model -> %s", model_path)
     LOGGER.info("Saved vectorizer -> %s", vec_path)
+
+    # Raw-array export for serving: np.load(..., mmap_mode='r') lets every
+    # worker process share one page-cache copy of the coefficients instead
+    # of unpickling a private duplicate (see FastLinearSpamModel).
+    np.save(out_dir / "lr_coef.npy", model.coef_.astype(np.float32))
+    np.save(out_dir / "lr_intercept.npy", model.intercept_.astype(np.float32))
+    np.save(out_dir / "tfidf_idf.npy", tfidf.idf_.astype(np.float32))
+    LOGGER.info("Saved raw coefficient arrays -> %s", out_dir)
     return model_path, vec_path
 
 
 def main() -> None:
     LOGGER.info("Loading datasets from: %s", DATA_DIR)
-    data = _load_datasets(DATA_DIR)
+    # Convert to pandas only at the sklearn boundary
+    data = _load_datasets(DATA_DIR).to_pandas()
     # Augment with free-offer spam samples
     aug = _augment_free_offer_samples(DATA_DIR)
     data = pd.concat([data, aug], ignore_index=True)
@@ -0,0 +1,33 @@
+"""
+AUTOLEADAI - Logging Setup
+Single place where the root logger gets configured
+Author: Team AUTOLEADAI
+"""
+import logging
+import config
+
+_configured = False
+
+
+def setup(level: str = None, fmt: str = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'):
+    """
+    Configure the root logger exactly once
+
+    Every src module used to call logging.basicConfig at import time.
+    basicConfig is a no-op once a handler exists, so whichever module
+    happened to be imported first silently decided the format for the
+    whole process. Importing modules now just create their named logger
+    and the entrypoint calls setup() once.
+
+    Args:
+        level: Log level name; defaults to config.LOG_LEVEL
+        fmt: Log record format string
+    """
+    global _configured
+    if _configured:
+        return
+    logging.basicConfig(
+        level=getattr(logging, level or config.LOG_LEVEL),
+        format=fmt
+    )
+    _configured = True
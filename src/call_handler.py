@@ -4,6 +4,13 @@ Orchestrates the complete call processing pipeline
 Author: Team AUTOLEADAI
 """
 import logging
+import os
+
+# Must be set before anything imports torch: CUDA then pages kernels in
+# on first use instead of eagerly pinning every module at init
+os.environ.setdefault("CUDA_MODULE_LOADING", "LAZY")
+
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict
 from datetime import datetime
@@ -14,10 +21,20 @@ from src.speech_to_text import get_stt_engine
 from src.spam_detector import get_spam_detector
 from src.call_logger import get_call_logger
 
-# Setup logging
-logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
+# Root logger is configured once by the entrypoint (see src/_logging.py)
 logger = logging.getLogger(__name__)
 
+# Spam report layout, filled in with one .format call per spam call
+SPAM_TEMPLATE = (
+    "SPAM CALL DETECTED\n"
+    "{sep}\n"
+    "Call ID: {cid}\n"
+    "Audio: {audio}\n"
+    "Confidence: {conf:.2%}\n"
+    "\nTranscript:\n{tx}\n"
+    "\nSpam Features:\n{feat}\n"
+)
+
 
 class CallHandler:
     """
@@ -26,15 +43,39 @@ class CallHandler:
     """
     
     def __init__(self):
-        """Initialize call handler and all components"""
+        """Initialize call handler; heavy components are created on first use"""
         logger.info("Initializing CallHandler...")
-        
+
         self.audio_processor = AudioProcessor()
-        self.stt_engine = get_stt_engine()
-        self.spam_detector = get_spam_detector()
-        self.call_logger = get_call_logger()
-        
+        # STT (Whisper weights), spam model and DB logger are materialized
+        # lazily via the properties below, so constructing a CallHandler —
+        # e.g. in a worker that only serves health checks — stays cheap
+        self._stt_engine = None
+        self._spam_detector = None
+        self._call_logger = None
+
         logger.info("CallHandler initialized successfully")
+
+    @property
+    def stt_engine(self):
+        """Speech-to-text engine, loaded on first access"""
+        if self._stt_engine is None:
+            self._stt_engine = get_stt_engine()
+        return self._stt_engine
+
+    @property
+    def spam_detector(self):
+        """Spam detector, loaded on first access"""
+        if self._spam_detector is None:
+            self._spam_detector = get_spam_detector()
+        return self._spam_detector
+
+    @property
+    def call_logger(self):
+        """Call logger, created on first access"""
+        if self._call_logger is None:
+            self._call_logger = get_call_logger()
+        return self._call_logger
     
     def process_call(self, audio_source: str, source_type: str = 'file') -> Dict:
         """
@@ -62,12 +103,19 @@ class CallHandler:
             
             logger.info(f"Audio acquired: {audio_path}")
             
-            # Step 2: Audio Preprocessing (Noise Reduction)
-            processed_audio = self.audio_processor.process_audio(audio_path)
+            # Step 2: Audio Preprocessing (Noise Reduction). store=False keeps
+            # the cleaned audio in memory — the WAV is only persisted later if
+            # the call turns out to be spam
+            processed_audio, processed_nd = self.audio_processor.process_audio(
+                audio_path, store=False
+            )
             logger.info("Audio preprocessing completed")
-            
-            # Step 3: Speech-to-Text Conversion
-            transcript = self.stt_engine.transcribe(processed_audio)
+
+            # Step 3: Speech-to-Text Conversion, straight from the ndarray —
+            # no WAV encode+decode round-trip between the two stages
+            transcript = self.stt_engine.transcribe(
+                processed_nd if processed_nd is not None else processed_audio
+            )
             
             if not transcript.get('success'):
                 logger.error("Transcription failed")
@@ -79,86 +127,217 @@ class CallHandler:
             
             logger.info(f"Transcription completed: {len(transcript['text'])} characters")
             
-            # Step 4: Spam Detection
-            spam_result = self.spam_detector.predict(transcript['text'])
-            spam_features = self.spam_detector.analyze_features(transcript['text'])
-            spam_result['features'] = spam_features
+            # Step 4: Spam Detection (prediction + feature analysis share one
+            # normalization pass over the transcript)
+            spam_result = self.spam_detector.predict_with_features(transcript['text'])
+            spam_features = spam_result['features']
             
             logger.info(f"Spam detection: {'SPAM' if spam_result['is_spam'] else 'LEGITIMATE'}")
             
             # Step 5: Calculate Duration
             processing_time = (datetime.now() - start_time).total_seconds()
+
+            # Steps 6+7: Log to Database and Handle Spam. The two are
+            # independent I/O (SQLite insert vs. spam log file), so overlap
+            # them: the spam handler gets the log future and only blocks on
+            # the call id right before it needs it
+            # The processed WAV only exists on disk for spam calls; legit
+            # calls keep the original recording as their stored path
+            stored_audio = processed_audio if spam_result['is_spam'] else audio_path
+
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                log_future = executor.submit(
+                    self.call_logger.log_call,
+                    audio_path=stored_audio,
+                    transcript=transcript,
+                    spam_result=spam_result,
+                    duration=processing_time,
+                    metadata={
+                        'source_type': source_type,
+                        'processing_time': processing_time,
+                        'original_audio': audio_path
+                    }
+                )
+
+                spam_future = None
+                if spam_result['is_spam']:
+                    spam_future = executor.submit(
+                        self._handle_spam_call, log_future,
+                        processed_audio, transcript, spam_result,
+                        processed_nd
+                    )
+
+                call_id = log_future.result()
+                logger.info(f"Call logged: call_id={call_id}")
+                if spam_future is not None:
+                    spam_future.result()
+            
+            # Prepare result
+            result = {
+                'success': True,
+                'call_id': call_id,
+                'audio_path': stored_audio,
+                'transcript': transcript['text'],
+                'is_spam': spam_result['is_spam'],
+                'spam_confidence': spam_result['confidence'],
+                'spam_features': spam_features,
+                'processing_time': processing_time,
+                'status': 'spam_blocked' if spam_result['is_spam'] else 'processed'
+            }
             
-            # Step 6: Log to Database
+            logger.info(f"Call processing completed in {processing_time:.2f}s")
+            return result
+            
+        except Exception as e:
+            logger.error(f"Call processing failed: {e}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+    
+    def process_call_stream(self, audio_source: str):
+        """
+        Streaming variant of process_call for uploaded files
+
+        Yields partial transcript events while Whisper is still working, and
+        runs spam detection on the confirmed partial text so obvious spam is
+        flagged before the end of the file. The last yielded event is the
+        same result dictionary process_call returns.
+
+        Args:
+            audio_source: Path to audio file
+
+        Yields:
+            Event dictionaries: {'type': 'partial', ...} during
+            transcription, then {'type': 'result', ...} once at the end
+        """
+        try:
+            start_time = datetime.now()
+            logger.info(f"Starting streaming call processing: {audio_source}")
+
+            audio_path = self.audio_processor.load_audio_file(audio_source)
+            # The streaming transcriber reads from disk, so keep store=True
+            processed_audio, _ = self.audio_processor.process_audio(audio_path)
+
+            transcript_text = ''
+            transcript_meta = {}
+            for partial in self.stt_engine.transcribe_stream(processed_audio):
+                transcript_text = partial['text']
+                if partial.get('final'):
+                    transcript_meta = partial
+                    break
+                # Classify the confirmed prefix so spam shows up early
+                early_spam = self.spam_detector.predict(transcript_text)
+                yield {
+                    'type': 'partial',
+                    'text': transcript_text,
+                    'new_text': partial['new_text'],
+                    'is_spam': early_spam['is_spam'],
+                    'spam_confidence': early_spam['confidence']
+                }
+
+            transcript = {
+                'text': transcript_text,
+                'language': transcript_meta.get('language', config.WHISPER_LANGUAGE),
+                'segments': [],
+                'success': True,
+                'audio_path': processed_audio
+            }
+
+            # Final spam verdict, logging and spam handling as in process_call
+            spam_result = self.spam_detector.predict_with_features(transcript_text)
+            spam_features = spam_result['features']
+
+            processing_time = (datetime.now() - start_time).total_seconds()
+
             call_id = self.call_logger.log_call(
                 audio_path=processed_audio,
                 transcript=transcript,
                 spam_result=spam_result,
                 duration=processing_time,
                 metadata={
-                    'source_type': source_type,
+                    'source_type': 'file',
                     'processing_time': processing_time,
-                    'original_audio': audio_path
+                    'original_audio': audio_path,
+                    'streaming': True
                 }
             )
-            
-            logger.info(f"Call logged: call_id={call_id}")
-            
-            # Step 7: Handle Spam
+
             if spam_result['is_spam']:
                 self._handle_spam_call(call_id, processed_audio, transcript, spam_result)
-            
-            # Prepare result
-            result = {
+
+            yield {
+                'type': 'result',
                 'success': True,
                 'call_id': call_id,
                 'audio_path': processed_audio,
-                'transcript': transcript['text'],
+                'transcript': transcript_text,
                 'is_spam': spam_result['is_spam'],
                 'spam_confidence': spam_result['confidence'],
                 'spam_features': spam_features,
                 'processing_time': processing_time,
                 'status': 'spam_blocked' if spam_result['is_spam'] else 'processed'
             }
-            
-            logger.info(f"Call processing completed in {processing_time:.2f}s")
-            return result
-            
+
         except Exception as e:
-            logger.error(f"Call processing failed: {e}")
-            return {
+            logger.error(f"Streaming call processing failed: {e}")
+            yield {
+                'type': 'result',
                 'success': False,
                 'error': str(e)
             }
-    
-    def _handle_spam_call(self, call_id: int, audio_path: str, 
-                         transcript: Dict, spam_result: Dict):
+
+    def _handle_spam_call(self, call_id, audio_path: str,
+                         transcript: Dict, spam_result: Dict,
+                         audio_data=None):
         """
         Handle detected spam call
-        
+
         Args:
-            call_id: Database call ID
+            call_id: Database call ID, or a Future resolving to one (so the
+                directory setup below can overlap the DB insert)
             audio_path: Path to audio file
             transcript: Transcript data
             spam_result: Spam detection result
+            audio_data: Processed audio buffer not yet on disk; persisted to
+                audio_path here as evidence (legit calls never write it)
         """
         try:
             # Move audio to spam directory
             spam_dir = Path(config.SPAM_STORAGE_PATH)
             spam_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Create spam log file
+
+            # Persist the cleaned audio for spam calls only
+            if audio_data is not None:
+                self.audio_processor.save_audio(audio_data, audio_path)
+
+            # The log's name and header need the DB-assigned id; block on it
+            # only now, after the id-independent work is done
+            if isinstance(call_id, Future):
+                call_id = call_id.result()
+
+            # Create spam log file: fill the precompiled template once and
+            # write it with a single syscall instead of a dozen small
+            # buffered f.write calls
             spam_log_path = spam_dir / f"spam_call_{call_id}.txt"
-            with open(spam_log_path, 'w', encoding='utf-8') as f:
-                f.write(f"SPAM CALL DETECTED\n")
-                f.write(f"=" * 50 + "\n")
-                f.write(f"Call ID: {call_id}\n")
-                f.write(f"Audio: {audio_path}\n")
-                f.write(f"Confidence: {spam_result['confidence']:.2%}\n")
-                f.write(f"\nTranscript:\n{transcript['text']}\n")
-                f.write(f"\nSpam Features:\n")
-                for category, data in spam_result.get('features', {}).items():
-                    f.write(f"  {category}: {data}\n")
+            body = SPAM_TEMPLATE.format(
+                sep="=" * 50,
+                cid=call_id,
+                audio=audio_path,
+                conf=spam_result['confidence'],
+                tx=transcript['text'],
+                feat="\n".join(
+                    f"  {category}: {data}"
+                    for category, data in spam_result.get('features', {}).items()
+                )
+            )
+
+            fd = os.open(str(spam_log_path),
+                         os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, body.encode('utf-8'))
+            finally:
+                os.close(fd)
             
             logger.info(f"Spam call handled: {spam_log_path}")
             
@@ -3,18 +3,137 @@ AUTOLEADAI - Call Logging Module
 Database management and call logging system
 Author: Awais Ahmad
 """
+import atexit
 import sqlite3
 import json
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 import config
 
-# Setup logging
-logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
+# Root logger is configured once by the entrypoint (see src/_logging.py)
 logger = logging.getLogger(__name__)
 
+# orjson serializes Whisper's segment arrays (hundreds of float-heavy
+# dicts) several times faster than stdlib json and handles numpy scalars
+# natively; keep stdlib json as the fallback
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Whisper segment arrays dominate transcript row size; store them as
+# zstd-compressed bytes (BLOB) rather than TEXT JSON. zlib stands in when
+# zstandard isn't installed
+try:
+    import zstandard
+
+    _zstd_c = zstandard.ZstdCompressor(level=3)
+    _zstd_d = zstandard.ZstdDecompressor()
+    _compress = _zstd_c.compress
+    _decompress = _zstd_d.decompress
+except ImportError:
+    import zlib
+
+    def _compress(data: bytes) -> bytes:
+        return zlib.compress(data, 3)
+
+    _decompress = zlib.decompress
+
+
+# SQL literals hoisted to module level: sqlite3's per-connection statement
+# cache is keyed on the SQL text, so reusing the same string objects lets
+# the hot path skip sqlite3_prepare on every call
+_SQL_INSERT_CALL = '''
+    INSERT INTO calls (
+        audio_path, duration, transcript, is_spam,
+        spam_confidence, spam_features, metadata
+    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_INSERT_TRANSCRIPT = '''
+    INSERT INTO transcripts (call_id, full_text, language, segments)
+    VALUES (?, ?, ?, ?)
+'''
+_SQL_INSERT_SPAM = '''
+    INSERT INTO spam_calls (
+        call_id, audio_path, transcript,
+        spam_confidence, spam_features
+    ) VALUES (?, ?, ?, ?, ?)
+'''
+_SQL_GET_CALL = 'SELECT * FROM calls WHERE call_id = ?'
+_SQL_GET_SEGMENTS = 'SELECT segments FROM transcripts WHERE call_id = ?'
+_SQL_STATISTICS = '''
+    SELECT COUNT(*),
+           SUM(is_spam),
+           AVG(CASE WHEN is_spam = 1 THEN spam_confidence END)
+    FROM calls
+'''
+_CALL_COLUMNS = ('call_id, timestamp, audio_path, duration, transcript, '
+                 'is_spam, spam_confidence, spam_features, status, metadata')
+_SQL_ALL_CALLS = f'SELECT {_CALL_COLUMNS} FROM calls ORDER BY timestamp DESC LIMIT ?'
+_SQL_SPAM_CALLS = (f'SELECT {_CALL_COLUMNS} FROM calls WHERE is_spam = 1 '
+                   'ORDER BY timestamp DESC LIMIT ?')
+_SQL_EXPORT = f'SELECT {_CALL_COLUMNS} FROM calls ORDER BY timestamp DESC'
+_SQL_SPAM_EXPORT = (f'SELECT {_CALL_COLUMNS} FROM calls WHERE is_spam = 1 '
+                    'ORDER BY timestamp DESC')
+
+
+class LazyCall:
+    """
+    Dict-like view over a calls row that defers JSON parsing
+
+    get_all_calls used to eagerly parse 'metadata' and 'spam_features'
+    for every row, but dashboard consumers rarely touch either field.
+    This wrapper keeps the underlying sqlite3.Row and only parses a JSON
+    column the first time it is subscripted, memoizing the result. It
+    supports keys()/iteration so dict(call) still works for callers that
+    need a plain dict (e.g. jsonify).
+    """
+
+    __slots__ = ('_row', '_parsed')
+
+    _JSON_COLUMNS = ('metadata', 'spam_features')
+
+    def __init__(self, row: sqlite3.Row):
+        self._row = row
+        self._parsed = {}
+
+    def __getitem__(self, key):
+        if key in self._JSON_COLUMNS:
+            if key not in self._parsed:
+                self._parsed[key] = _loads(self._row[key] or '{}')
+            return self._parsed[key]
+        return self._row[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except (IndexError, KeyError):
+            return default
+
+    def keys(self):
+        return self._row.keys()
+
+    def __iter__(self):
+        return iter(self._row.keys())
+
+    def __len__(self):
+        return len(self._row)
+
+    def __contains__(self, key):
+        return key in self._row.keys()
+
+    def __repr__(self):
+        return f'LazyCall(call_id={self._row["call_id"]})'
+
 
 class CallLogger:
     """
@@ -30,17 +149,35 @@ class CallLogger:
             db_path: Path to SQLite database
         """
         self.db_path = db_path
+        self._conn = None
+        # One connection shared across threads (the call handler logs from a
+        # worker thread); serialize access ourselves
+        self._lock = threading.Lock()
         self._init_database()
-    
+
     def _init_database(self):
-        """Initialize database schema"""
+        """Initialize database schema and the persistent connection"""
         try:
             # Ensure database directory exists
             Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            conn = sqlite3.connect(self.db_path)
+
+            # One connection for the logger's lifetime: re-opening per call
+            # paid connect + fsync-heavy default journaling on every insert
+            conn = sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None,
+                cached_statements=256
+            )
             cursor = conn.cursor()
-            
+
+            # WAL + relaxed sync turns each commit from a full journal
+            # rewrite into an append; the rest keeps temp data and hot pages
+            # in memory
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
+            cursor.execute('PRAGMA temp_store=MEMORY')
+            cursor.execute('PRAGMA mmap_size=268435456')
+            cursor.execute('PRAGMA cache_size=-20000')
+
             # Create calls table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS calls (
@@ -79,17 +216,34 @@ class CallLogger:
                     call_id INTEGER,
                     full_text TEXT,
                     language TEXT,
-                    segments TEXT,
+                    segments BLOB,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
                     FOREIGN KEY (call_id) REFERENCES calls (call_id)
                 )
             ''')
             
-            conn.commit()
-            conn.close()
-            
+            # Indexes backing the dashboard queries: get_all_calls orders by
+            # timestamp (optionally filtered on is_spam), and get_statistics
+            # averages spam_confidence over spam rows only — each becomes an
+            # index scan instead of a full-table scan + sort
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_calls_ts
+                ON calls(timestamp DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_calls_spam_ts
+                ON calls(is_spam, timestamp DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_spam_only
+                ON calls(spam_confidence) WHERE is_spam = 1
+            ''')
+
+            self._conn = conn
+            atexit.register(self._conn.close)
+
             logger.info(f"Database initialized: {self.db_path}")
-            
+
         except Exception as e:
             logger.error(f"Database initialization failed: {e}")
             raise
@@ -110,65 +264,150 @@ class CallLogger:
             call_id of logged call
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             # Extract spam features
-            spam_features_json = json.dumps(spam_result.get('features', {}))
-            
-            # Insert into calls table
-            cursor.execute('''
-                INSERT INTO calls (
-                    audio_path, duration, transcript, is_spam, 
-                    spam_confidence, spam_features, metadata
-                ) VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                audio_path,
-                duration,
-                transcript.get('text', ''),
-                spam_result.get('is_spam', False),
-                spam_result.get('confidence', 0.0),
-                spam_features_json,
-                json.dumps(metadata or {})
-            ))
-            
-            call_id = cursor.lastrowid
-            
-            # Log transcript details
-            cursor.execute('''
-                INSERT INTO transcripts (call_id, full_text, language, segments)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                call_id,
-                transcript.get('text', ''),
-                transcript.get('language', 'en'),
-                json.dumps(transcript.get('segments', []))
-            ))
-            
-            # If spam, log to spam_calls table
-            if spam_result.get('is_spam', False):
-                cursor.execute('''
-                    INSERT INTO spam_calls (
-                        call_id, audio_path, transcript, 
-                        spam_confidence, spam_features
-                    ) VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    call_id,
-                    audio_path,
-                    transcript.get('text', ''),
-                    spam_result.get('confidence', 0.0),
-                    spam_features_json
-                ))
-            
-            conn.commit()
-            conn.close()
-            
-            logger.info(f"Call logged successfully: call_id={call_id}, spam={spam_result.get('is_spam')}")
+            spam_features_json = _dumps(spam_result.get('features', {}))
+
+            with self._lock:
+                cursor = self._conn.cursor()
+                # One explicit transaction for all 2-3 inserts — a single
+                # WAL append instead of a sync per statement
+                cursor.execute('BEGIN IMMEDIATE')
+                try:
+                    call_id = self._insert_call_rows(
+                        cursor, audio_path, transcript, spam_result,
+                        duration, metadata, spam_features_json
+                    )
+                    cursor.execute('COMMIT')
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
+
+            # %-style args: the formatting only runs if INFO is enabled
+            logger.info("Call logged successfully: call_id=%s, spam=%s",
+                        call_id, spam_result.get('is_spam'))
             return call_id
-            
+
         except Exception as e:
             logger.error(f"Failed to log call: {e}")
             raise
+
+    def log_calls_bulk(self, records: List[Dict]) -> List[int]:
+        """
+        Log many processed calls in one transaction
+
+        Each record is a dict with the log_call arguments: audio_path,
+        transcript, spam_result and optional duration/metadata. All rows
+        share a single BEGIN/COMMIT, so the per-commit WAL sync is paid once
+        for the whole batch instead of once per call. The calls rows are
+        inserted one-by-one (lastrowid isn't defined for executemany) but
+        the transcript and spam rows are batched with executemany.
+
+        Args:
+            records: List of call record dictionaries
+
+        Returns:
+            List of call_ids in input order
+        """
+        if not records:
+            return []
+
+        try:
+            call_ids = []
+            transcript_rows = []
+            spam_rows = []
+
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                try:
+                    for record in records:
+                        transcript = record['transcript']
+                        spam_result = record['spam_result']
+                        audio_path = record['audio_path']
+                        spam_features_json = _dumps(spam_result.get('features', {}))
+
+                        cursor.execute(_SQL_INSERT_CALL, (
+                            audio_path,
+                            record.get('duration', 0.0),
+                            transcript.get('text', ''),
+                            spam_result.get('is_spam', False),
+                            spam_result.get('confidence', 0.0),
+                            spam_features_json,
+                            _dumps(record.get('metadata') or {})
+                        ))
+                        call_id = cursor.lastrowid
+                        call_ids.append(call_id)
+
+                        transcript_rows.append((
+                            call_id,
+                            transcript.get('text', ''),
+                            transcript.get('language', 'en'),
+                            _compress(_dumps(transcript.get('segments', [])).encode('utf-8'))
+                        ))
+                        if spam_result.get('is_spam', False):
+                            spam_rows.append((
+                                call_id,
+                                audio_path,
+                                transcript.get('text', ''),
+                                spam_result.get('confidence', 0.0),
+                                spam_features_json
+                            ))
+
+                    cursor.executemany(_SQL_INSERT_TRANSCRIPT, transcript_rows)
+                    if spam_rows:
+                        cursor.executemany(_SQL_INSERT_SPAM, spam_rows)
+
+                    cursor.execute('COMMIT')
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
+
+            logger.info("Bulk-logged %d calls", len(call_ids))
+            return call_ids
+
+        except Exception as e:
+            logger.error(f"Failed to bulk-log calls: {e}")
+            raise
+
+    def _insert_call_rows(self, cursor, audio_path, transcript, spam_result,
+                          duration, metadata, spam_features_json) -> int:
+        """Run the inserts for one call on an open cursor (no commit)
+
+        Returns:
+            call_id of the inserted calls row
+        """
+        # Insert into calls table
+        cursor.execute(_SQL_INSERT_CALL, (
+            audio_path,
+            duration,
+            transcript.get('text', ''),
+            spam_result.get('is_spam', False),
+            spam_result.get('confidence', 0.0),
+            spam_features_json,
+            _dumps(metadata or {})
+        ))
+
+        call_id = cursor.lastrowid
+
+        # Log transcript details
+        cursor.execute(_SQL_INSERT_TRANSCRIPT, (
+            call_id,
+            transcript.get('text', ''),
+            transcript.get('language', 'en'),
+            _compress(_dumps(transcript.get('segments', [])).encode('utf-8'))
+        ))
+
+        # If spam, log to spam_calls table
+        if spam_result.get('is_spam', False):
+            cursor.execute(_SQL_INSERT_SPAM, (
+                call_id,
+                audio_path,
+                transcript.get('text', ''),
+                spam_result.get('confidence', 0.0),
+                spam_features_json
+            ))
+
+        return call_id
     
     def get_call(self, call_id: int) -> Optional[Dict]:
         """
@@ -181,61 +420,79 @@ class CallLogger:
             Call details dictionary or None
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM calls WHERE call_id = ?', (call_id,))
-            row = cursor.fetchone()
-            
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(_SQL_GET_CALL, (call_id,))
+                row = cursor.fetchone()
+
             if row:
                 result = dict(row)
-                result['metadata'] = json.loads(result.get('metadata', '{}'))
-                result['spam_features'] = json.loads(result.get('spam_features', '{}'))
-                conn.close()
+                result['metadata'] = _loads(result.get('metadata', '{}'))
+                result['spam_features'] = _loads(result.get('spam_features', '{}'))
                 return result
-            
-            conn.close()
+
             return None
             
         except Exception as e:
             logger.error(f"Failed to retrieve call: {e}")
             return None
     
-    def get_all_calls(self, limit: int = 100, spam_only: bool = False) -> List[Dict]:
+    def get_transcript_segments(self, call_id: int) -> List[Dict]:
+        """
+        Decompress and return the Whisper segments for one call
+
+        Segments are stored compressed and are deliberately not part of
+        get_all_calls rows; fetch them on demand for the calls that need
+        the detail view.
+
+        Args:
+            call_id: Call ID
+
+        Returns:
+            List of segment dictionaries (empty if none logged)
+        """
+        try:
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.execute(_SQL_GET_SEGMENTS, (call_id,))
+                row = cursor.fetchone()
+
+            if row is None or row[0] is None:
+                return []
+            blob = row[0]
+            if isinstance(blob, bytes):
+                return _loads(_decompress(blob))
+            # Rows written before the BLOB migration hold plain JSON text
+            return _loads(blob)
+
+        except Exception as e:
+            logger.error(f"Failed to retrieve segments: {e}")
+            return []
+
+    def get_all_calls(self, limit: int = 100, spam_only: bool = False) -> List[LazyCall]:
         """
         Retrieve all calls
-        
+
         Args:
             limit: Maximum number of calls to retrieve
             spam_only: If True, only return spam calls
-        
+
         Returns:
-            List of call dictionaries
+            List of LazyCall row views (dict-like; JSON columns parse on
+            first access)
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            if spam_only:
-                query = 'SELECT * FROM calls WHERE is_spam = 1 ORDER BY timestamp DESC LIMIT ?'
-            else:
-                query = 'SELECT * FROM calls ORDER BY timestamp DESC LIMIT ?'
-            
-            cursor.execute(query, (limit,))
-            rows = cursor.fetchall()
-            
-            results = []
-            for row in rows:
-                call_dict = dict(row)
-                call_dict['metadata'] = json.loads(call_dict.get('metadata', '{}'))
-                call_dict['spam_features'] = json.loads(call_dict.get('spam_features', '{}'))
-                results.append(call_dict)
-            
-            conn.close()
-            return results
-            
+            query = _SQL_SPAM_CALLS if spam_only else _SQL_ALL_CALLS
+
+            with self._lock:
+                cursor = self._conn.cursor()
+                cursor.row_factory = sqlite3.Row
+                cursor.execute(query, (limit,))
+                rows = cursor.fetchall()
+
+            return [LazyCall(row) for row in rows]
+
         except Exception as e:
             logger.error(f"Failed to retrieve calls: {e}")
             return []
@@ -248,26 +505,20 @@ class CallLogger:
             Dictionary with statistics
         """
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Total calls
-            cursor.execute('SELECT COUNT(*) FROM calls')
-            total_calls = cursor.fetchone()[0]
-            
-            # Spam calls
-            cursor.execute('SELECT COUNT(*) FROM calls WHERE is_spam = 1')
-            spam_calls = cursor.fetchone()[0]
-            
+            with self._lock:
+                cursor = self._conn.cursor()
+
+                # Conditional aggregation: one table read instead of three
+                # separate COUNT/AVG round-trips
+                cursor.execute(_SQL_STATISTICS)
+                total_calls, spam_calls, avg_spam_confidence = cursor.fetchone()
+
+            spam_calls = spam_calls or 0
+            avg_spam_confidence = avg_spam_confidence or 0.0
+
             # Legitimate calls
             legitimate_calls = total_calls - spam_calls
             
-            # Average spam confidence
-            cursor.execute('SELECT AVG(spam_confidence) FROM calls WHERE is_spam = 1')
-            avg_spam_confidence = cursor.fetchone()[0] or 0.0
-            
-            conn.close()
-            
             stats = {
                 'total_calls': total_calls,
                 'spam_calls': spam_calls,
@@ -292,20 +543,37 @@ class CallLogger:
         """
         try:
             import csv
-            
-            calls = self.get_all_calls(limit=10000, spam_only=spam_only)
-            
-            if not calls:
-                logger.warning("No calls to export")
-                return
-            
-            with open(output_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=calls[0].keys())
-                writer.writeheader()
-                writer.writerows(calls)
-            
-            logger.info(f"Exported {len(calls)} calls to {output_path}")
-            
+
+            # Stream rows straight from the cursor: no 10k-dict list in
+            # memory, and the stored JSON columns pass through as-is
+            # instead of being parsed and re-stringified per row. A
+            # short-lived read connection keeps the export off the shared
+            # connection: WAL lets it run alongside concurrent log_call
+            # writers instead of holding self._lock for the whole dump
+            query = _SQL_SPAM_EXPORT if spam_only else _SQL_EXPORT
+            conn = sqlite3.connect(self.db_path)
+            try:
+                cursor = conn.execute(query)
+                first = cursor.fetchone()
+                if first is None:
+                    # Don't leave a header-only file behind
+                    logger.warning("No calls to export")
+                    return
+                columns = [d[0] for d in cursor.description]
+
+                with open(output_path, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns)
+                    writer.writerow(first)
+                    exported = 1
+                    for row in cursor:
+                        writer.writerow(row)
+                        exported += 1
+            finally:
+                conn.close()
+
+            logger.info(f"Exported {exported} calls to {output_path}")
+
         except Exception as e:
             logger.error(f"Export failed: {e}")
 
@@ -4,19 +4,38 @@ Handles real-time speech recognition using OpenAI Whisper
 Author: Awais Ahmad
 
 TODO: Add support for multiple languages
-TODO: Implement streaming transcription for real-time calls
 TODO: Optimize model loading time (currently takes 2-3 seconds)
 """
-import whisper
-import torch
+# whisper and torch are imported lazily inside SpeechToText so that merely
+# importing this module (e.g. from the call handler) doesn't pull in the
+# full torch/CUDA stack; numpy and soundfile are cheap and used on every
+# transcription, so they load here rather than adding first-call latency
+import hashlib
+import json
 import logging
 import os
+import sqlite3
+import threading
+import numpy as np
+import soundfile as sf
 from pathlib import Path
 from typing import Optional, Dict
 import config
 
-# Setup logging
-logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
+# Cached transcripts carry Whisper segment floats; orjson parses and
+# serializes them much faster when present
+try:
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+
+    _loads = orjson.loads
+except ImportError:
+    _dumps = json.dumps
+    _loads = json.loads
+
+# Root logger is configured once by the entrypoint (see src/_logging.py)
 logger = logging.getLogger(__name__)
 
 # Set ffmpeg path for Whisper
@@ -34,72 +53,254 @@ class SpeechToText:
     Provides accurate transcription with minimal latency
     """
     
-    def __init__(self, model_size: str = config.WHISPER_MODEL):
+    def __init__(self, model_size: str = config.WHISPER_MODEL,
+                 backend: str = config.WHISPER_BACKEND):
         """
         Initialize the Whisper model
-        
+
         Args:
             model_size: Size of Whisper model (tiny, base, small, medium, large)
+            backend: 'faster-whisper' (CTranslate2) or 'openai-whisper'
         """
+        import torch
+
         self.model_size = model_size
+        self.backend = backend
         self.model = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        logger.info(f"Initializing Whisper model on {self.device}")
+        logger.info(f"Initializing Whisper model on {self.device} ({self.backend})")
+        self._cache = self._open_cache()
         self._load_model()
-    
+
+    def _open_cache(self):
+        """
+        Open the on-disk transcription cache
+
+        Results are keyed on a hash of the raw audio bytes, so re-uploads
+        of the same recording (common in the demo and in retried calls)
+        skip the Whisper forward pass entirely.
+
+        Returns:
+            sqlite3 connection, or None if the cache can't be opened
+        """
+        try:
+            cache_path = Path(config.DB_PATH).parent / 'stt_cache.db'
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(cache_path), check_same_thread=False)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS transcripts (
+                    hash TEXT PRIMARY KEY,
+                    result BLOB NOT NULL
+                )
+            ''')
+            conn.commit()
+            return conn
+        except Exception as e:
+            logger.warning(f"Transcription cache unavailable: {e}")
+            return None
+
+    @staticmethod
+    def _content_hash(audio_bytes: bytes) -> str:
+        """Hash raw audio bytes for cache lookup (keyed on content, not path)"""
+        return hashlib.blake2b(audio_bytes, digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Return a cached transcription result, or None on miss"""
+        if self._cache is None:
+            return None
+        try:
+            row = self._cache.execute(
+                'SELECT result FROM transcripts WHERE hash = ?', (key,)
+            ).fetchone()
+            if row:
+                return _loads(row[0])
+        except Exception as e:
+            logger.warning(f"Transcription cache read failed: {e}")
+        return None
+
+    def _cache_put(self, key: str, result: Dict):
+        """Store a successful transcription result under its content hash"""
+        if self._cache is None:
+            return
+        try:
+            self._cache.execute(
+                'INSERT OR REPLACE INTO transcripts (hash, result) VALUES (?, ?)',
+                (key, _dumps(result))
+            )
+            self._cache.commit()
+        except Exception as e:
+            logger.warning(f"Transcription cache write failed: {e}")
+
     def _load_model(self):
         """Load the Whisper model into memory"""
         try:
+            if self.backend == 'faster-whisper':
+                try:
+                    from faster_whisper import WhisperModel
+
+                    compute_type = config.WHISPER_COMPUTE_TYPE
+                    if compute_type == 'auto':
+                        # Whisper is bandwidth-bound: int8 weights on CPU,
+                        # half precision on GPU
+                        compute_type = 'float16' if self.device == 'cuda' else 'int8'
+
+                    logger.info(f"Loading faster-whisper {self.model_size} model "
+                                f"(compute_type={compute_type})...")
+                    self.model = WhisperModel(
+                        self.model_size,
+                        device=self.device,
+                        compute_type=compute_type,
+                        cpu_threads=os.cpu_count() or 1
+                    )
+                    logger.info("faster-whisper model loaded successfully")
+                    return
+                except ImportError:
+                    logger.warning("faster-whisper not installed, "
+                                   "falling back to openai-whisper")
+                    self.backend = 'openai-whisper'
+
+            import whisper
+
             logger.info(f"Loading Whisper {self.model_size} model...")
             self.model = whisper.load_model(self.model_size, device=self.device)
+
+            # On GPU, compile the encoder once so repeated transcriptions
+            # reuse captured kernels instead of paying Python-side launch
+            # overhead per call (the faster-whisper backend gets the same
+            # effect natively from CTranslate2)
+            if self.device == 'cuda':
+                try:
+                    import torch
+                    self.model.encoder = torch.compile(
+                        self.model.encoder, mode='reduce-overhead'
+                    )
+                    logger.info("Whisper encoder compiled with torch.compile")
+                except Exception as e:
+                    logger.warning(f"torch.compile unavailable: {e}")
+
             logger.info("Whisper model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             raise
+
+    def _load_audio_16k(self, audio_path: str):
+        """
+        Load a file as float32 mono 16 kHz for the model
+
+        soundfile decodes WAV/FLAC directly without librosa's audioread
+        dispatch; resampling, when needed, runs through torchaudio's
+        native kernel. librosa remains the fallback for formats libsndfile
+        can't read (mp3 etc.).
+
+        Returns:
+            Contiguous float32 ndarray at 16 kHz
+        """
+        try:
+            audio_data, sr = sf.read(audio_path, dtype='float32', always_2d=False)
+        except Exception:
+            import librosa
+            audio_data, _ = librosa.load(audio_path, sr=16000, mono=True)
+            return np.ascontiguousarray(audio_data, dtype=np.float32)
+
+        if audio_data.ndim > 1:
+            audio_data = audio_data.mean(axis=1)
+        if sr != 16000:
+            import torch
+            import torchaudio
+            audio_data = torchaudio.functional.resample(
+                torch.from_numpy(audio_data), sr, 16000
+            ).numpy()
+        return np.ascontiguousarray(audio_data, dtype=np.float32)
+
+    def _run_model(self, audio_data, language: str) -> Dict:
+        """Run the loaded backend on a float32 audio array.
+
+        Returns a uniform dict with 'text', 'language' and 'segments'
+        regardless of backend.
+        """
+        if self.backend == 'faster-whisper':
+            segments, info = self.model.transcribe(
+                audio_data,
+                language=language,
+                beam_size=1,
+                vad_filter=True
+            )
+            segment_list = [
+                {'start': s.start, 'end': s.end, 'text': s.text}
+                for s in segments
+            ]
+            return {
+                'text': ''.join(s['text'] for s in segment_list).strip(),
+                'language': info.language,
+                'segments': segment_list
+            }
+
+        return self.model.transcribe(
+            audio_data,
+            language=language,
+            fp16=False,  # Use FP32 for CPU compatibility
+            verbose=False
+        )
     
-    def transcribe(self, audio_path: str, language: str = config.WHISPER_LANGUAGE) -> Dict:
+    def transcribe(self, audio_source, language: str = config.WHISPER_LANGUAGE) -> Dict:
         """
-        Transcribe audio file to text
-        
+        Transcribe audio to text
+
         Args:
-            audio_path: Path to audio file
+            audio_source: Path to audio file, or a float32 ndarray already at
+                16 kHz mono (skips the WAV write+read round-trip entirely)
             language: Language code (default: 'en')
-        
+
         Returns:
             Dictionary containing transcript and metadata
         """
+        audio_path = None
+        cache_key = None
         try:
-            logger.info(f"Transcribing audio: {audio_path}")
-            
-            # Convert path to absolute
-            audio_path = os.path.abspath(audio_path)
-            logger.info(f"Absolute path: {audio_path}")
-            
-            # Check if file exists
-            if not os.path.exists(audio_path):
-                raise FileNotFoundError(f"Audio file not found: {audio_path}")
-            
-            # Load audio using librosa (doesn't need ffmpeg)
-            # Note: Initially tried Whisper's built-in audio loading but had ffmpeg issues on Windows
-            # This approach using librosa works better - discussed with team on Oct 20
-            import librosa
-            import numpy as np
-            
-            logger.info("Loading audio with librosa...")
-            audio_data, sr = librosa.load(audio_path, sr=16000, mono=True)
-            
-            # Ensure audio is in correct format for Whisper
-            audio_data = audio_data.astype(np.float32)
-            logger.info(f"Audio loaded: {len(audio_data)} samples at {sr}Hz")
-            
+            if isinstance(audio_source, np.ndarray):
+                # In-memory fast path: the preprocessing pipeline already has
+                # the samples at the target rate, no need to touch disk
+                audio_data = np.ascontiguousarray(audio_source, dtype=np.float32)
+                cache_key = self._content_hash(audio_data.tobytes())
+                # %-style args throughout transcribe: formatting is skipped
+                # entirely when INFO is disabled on this per-call path
+                logger.info("Transcribing in-memory audio: %d samples", len(audio_data))
+            else:
+                logger.info("Transcribing audio: %s", audio_source)
+
+                # Convert path to absolute
+                audio_path = os.path.abspath(audio_source)
+                logger.info("Absolute path: %s", audio_path)
+
+                # Check if file exists
+                if not os.path.exists(audio_path):
+                    raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+                # Hash the encoded file bytes before decoding so a cache hit
+                # skips both the decode and the model
+                with open(audio_path, 'rb') as f:
+                    cache_key = self._content_hash(f.read())
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    logger.info("Transcription cache hit for %s", audio_path)
+                    cached['audio_path'] = audio_path
+                    return cached
+
+                # Note: Initially tried Whisper's built-in audio loading but had ffmpeg issues on Windows
+                # Decoding ourselves works better - discussed with team on Oct 20
+                audio_data = self._load_audio_16k(audio_path)
+                logger.info("Audio loaded: %d samples at 16000Hz", len(audio_data))
+
+            if audio_path is None:
+                cached = self._cache_get(cache_key)
+                if cached is not None:
+                    logger.info("Transcription cache hit for in-memory audio")
+                    cached['audio_path'] = None
+                    return cached
+
             # Perform transcription with audio array instead of file path
-            result = self.model.transcribe(
-                audio_data,
-                language=language,
-                fp16=False,  # Use FP32 for CPU compatibility
-                verbose=False
-            )
-            
+            result = self._run_model(audio_data, language)
+
             transcript_data = {
                 'text': result['text'].strip(),
                 'language': result['language'],
@@ -107,14 +308,20 @@ class SpeechToText:
                 'success': True,
                 'audio_path': audio_path
             }
-            
-            logger.info(f"Transcription successful: {len(transcript_data['text'])} characters")
+
+            self._cache_put(cache_key, transcript_data)
+
+            logger.info("Transcription successful: %d characters",
+                        len(transcript_data['text']))
             return transcript_data
             
         except Exception as e:
-            logger.error(f"Transcription failed: {e}")
-            import traceback
-            logger.error(f"Full traceback: {traceback.format_exc()}")
+            logger.error("Transcription failed: %s", e)
+            # format_exc() walks and renders the whole stack; only pay for
+            # it when the record would actually be emitted
+            if logger.isEnabledFor(logging.ERROR):
+                import traceback
+                logger.error("Full traceback: %s", traceback.format_exc())
             return {
                 'text': '',
                 'success': False,
@@ -122,6 +329,107 @@ class SpeechToText:
                 'audio_path': audio_path
             }
     
+    def transcribe_stream(self, audio_path: str, language: str = config.WHISPER_LANGUAGE,
+                          chunk_seconds: float = 1.0, max_buffer_seconds: float = 30.0):
+        """
+        Transcribe audio incrementally, yielding confirmed partial results
+
+        Feeds the audio into a rolling buffer one chunk at a time and
+        re-transcribes the buffer as it grows. Words are confirmed with the
+        LocalAgreement-2 rule: a word is emitted once two consecutive
+        hypotheses agree on it, so consumers (e.g. spam detection) can act
+        on the transcript before the full file has been processed. The
+        buffer is trimmed at the last fully-confirmed segment boundary to
+        keep each model call bounded to ~max_buffer_seconds of audio.
+
+        Args:
+            audio_path: Path to audio file
+            language: Language code (default: 'en')
+            chunk_seconds: Size of each simulated streaming chunk
+            max_buffer_seconds: Rolling buffer cap before trimming
+
+        Yields:
+            Dictionaries with 'text' (confirmed so far), 'new_text' and
+            'final'; the last item has final=True plus metadata.
+        """
+        audio_path = os.path.abspath(audio_path)
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        audio_data = self._load_audio_16k(audio_path)
+        sr = 16000
+
+        chunk_size = int(sr * chunk_seconds)
+        max_buffer = int(sr * max_buffer_seconds)
+
+        buffer = np.zeros(0, dtype=np.float32)
+        prev_words = []        # previous hypothesis for the current buffer
+        buffer_confirmed = 0   # words of the current buffer already confirmed
+        confirmed = []         # all confirmed words across trims
+        detected_language = language
+
+        for start in range(0, len(audio_data), chunk_size):
+            buffer = np.concatenate([buffer, audio_data[start:start + chunk_size]])
+
+            result = self._run_model(buffer, language)
+            detected_language = result.get('language', language)
+            words = result['text'].strip().split()
+
+            # LocalAgreement-2: confirm the common prefix of the last two
+            # hypotheses for this buffer
+            agreed = self._agreed_prefix(prev_words, words)
+            if agreed > buffer_confirmed:
+                new_words = words[buffer_confirmed:agreed]
+                confirmed.extend(new_words)
+                buffer_confirmed = agreed
+                yield {
+                    'text': ' '.join(confirmed),
+                    'new_text': ' '.join(new_words),
+                    'final': False
+                }
+            prev_words = words
+
+            # Trim the buffer at the end of the last fully-confirmed segment
+            if len(buffer) > max_buffer:
+                cut_time = 0.0
+                dropped_words = 0
+                seen_words = 0
+                for segment in result.get('segments', []):
+                    seg_words = len(segment['text'].split())
+                    if seen_words + seg_words > buffer_confirmed:
+                        break
+                    seen_words += seg_words
+                    cut_time = segment['end']
+                    dropped_words = seen_words
+                if cut_time > 0:
+                    buffer = buffer[int(cut_time * sr):]
+                    buffer_confirmed -= dropped_words
+                    prev_words = prev_words[dropped_words:]
+
+        # Flush the tail of the last hypothesis (no second hypothesis will come)
+        remaining = prev_words[buffer_confirmed:]
+        if remaining:
+            confirmed.extend(remaining)
+
+        yield {
+            'text': ' '.join(confirmed),
+            'new_text': ' '.join(remaining),
+            'final': True,
+            'language': detected_language,
+            'success': True,
+            'audio_path': audio_path
+        }
+
+    @staticmethod
+    def _agreed_prefix(prev_words: list, words: list) -> int:
+        """Length of the common word prefix of two hypotheses (case-insensitive)"""
+        agreed = 0
+        for a, b in zip(prev_words, words):
+            if a.lower() != b.lower():
+                break
+            agreed += 1
+        return agreed
+
     def transcribe_realtime(self, audio_chunk: bytes) -> str:
         """
         Transcribe audio chunk in real-time
@@ -139,12 +447,17 @@ class SpeechToText:
 
 # Singleton instance
 _stt_instance: Optional[SpeechToText] = None
+_stt_lock = threading.Lock()
 
 
 def get_stt_engine() -> SpeechToText:
     """Get or create singleton instance of SpeechToText"""
     global _stt_instance
     if _stt_instance is None:
-        _stt_instance = SpeechToText()
+        # Lock so the background warm-up thread and the first request
+        # don't both load the model
+        with _stt_lock:
+            if _stt_instance is None:
+                _stt_instance = SpeechToText()
     return _stt_instance
 
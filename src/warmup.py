@@ -0,0 +1,45 @@
+"""
+AUTOLEADAI - Background Warm-up
+Loads the heavy singletons off the critical path at startup
+Author: Team AUTOLEADAI
+"""
+import logging
+import threading
+import config
+
+# Root logger is configured once by the entrypoint (see src/_logging.py)
+logger = logging.getLogger(__name__)
+
+_warmup_thread = None
+
+
+def prewarm():
+    """
+    Start loading the Whisper model and spam classifier in a daemon thread
+
+    CallHandler creates these lazily, which keeps startup cheap but pushes
+    the multi-second model load onto whichever request arrives first. Calling
+    prewarm() at server startup overlaps that load with Flask binding its
+    socket, so the first caller usually finds everything already in memory.
+    The singleton factories are guarded, so a request that races the warm-up
+    simply blocks on the same load instead of doing it twice.
+    """
+    global _warmup_thread
+    if _warmup_thread is not None:
+        return _warmup_thread
+
+    def _load():
+        try:
+            from src.speech_to_text import get_stt_engine
+            from src.spam_detector import get_spam_detector
+            get_stt_engine()
+            get_spam_detector()
+            logger.info("Warm-up complete: STT and spam models loaded")
+        except Exception as e:
+            # Warm-up is best-effort; a failure here will resurface (with
+            # proper error handling) on the first real request
+            logger.warning(f"Background warm-up failed: {e}")
+
+    _warmup_thread = threading.Thread(target=_load, name='model-warmup', daemon=True)
+    _warmup_thread.start()
+    return _warmup_thread
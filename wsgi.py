@@ -0,0 +1,9 @@
+"""
+AUTOLEADAI - WSGI Entry Point
+Exposes the Flask app for production servers (gunicorn)
+
+Run with: gunicorn -c gunicorn.conf.py wsgi
+"""
+from app import app
+
+application = app